@@ -1,5 +1,6 @@
 # chat_to_plan_short.py
-import random
+import random, time
+import instrumentation as metrics
 
 # ----- CONFIG -----
 RANDOM_SEED = None   # set int for reproducible runs, else None
@@ -57,6 +58,7 @@ def run(seed=None):
     pos = start; path=[pos]; msgs=[]
     steps=0
     while pos!=goal and steps<MAX_STEPS:
+        t0=time.perf_counter()
         steps+=1
         props={ag:propose(pos) for ag in agents}
         for ag,p in props.items(): msgs.append(f"{ag}: PROPOSE {p[0]}->{p[1]}")
@@ -70,10 +72,12 @@ def run(seed=None):
         best = max(tally.items(), key=lambda it: (it[1], -md(it[0], goal)))[0]
         pos = (best[0], best[1]); path.append(pos)
         msgs.append(f"SYSTEM: MOVE -> {pos}")
+        metrics.observe("plan_step_seconds", time.perf_counter()-t0, metrics.TIME_BUCKETS)
     return {"success": pos==goal, "steps": len(path)-1, "path":path, "msgs":msgs}
 
 if __name__=="__main__":
-    res = run(RANDOM_SEED)
+    with metrics.profiled():
+        res = run(RANDOM_SEED)
     # print trimmed conversation
     print("\n--- LOG (last 50) ---")
     for m in res['msgs'][-50:]:
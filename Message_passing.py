@@ -1,5 +1,6 @@
 # Minimal Message-Passing Maze (matches your desired output style)
 from collections import deque
+import instrumentation as metrics
 
 maze = [
   ['.','.','.','W','.','.','.','.'],
@@ -22,19 +23,27 @@ class Agent:
     def step(self):
         if not self.q: return None
         r,c=self.q.popleft()
+        metrics.incr("maze_bfs_nodes_expanded")
+        enq=0
         for dr,dc in [(-1,0),(1,0),(0,-1),(0,1)]:
             nr,nc=r+dr,c+dc
             if 0<=nr<8 and 0<=nc<8 and maze[nr][nc]!='W' and (nr,nc) not in self.visited:
                 self.visited.add((nr,nc))
                 self.parent[(nr,nc)]=(r,c)
                 self.q.append((nr,nc))
-                if maze[nr][nc]=='T': return (nr,nc)
+                enq+=1
+                if maze[nr][nc]=='T':
+                    metrics.incr("maze_bfs_nodes_enqueued", enq); return (nr,nc)
+        metrics.incr("maze_bfs_nodes_enqueued", enq)
         return None
     def share_to(self,other):
         new=self.visited - other.visited
         for cell in new:
             other.visited.add(cell)
             other.parent[cell]=self.parent.get(cell)
+        metrics.incr("maze_share_calls")
+        metrics.incr("maze_cells_transferred", len(new))
+        metrics.observe("maze_cells_per_share", len(new))
         return len(new)
     def path_to(self,end):
         p=[]; cur=end
@@ -47,20 +56,22 @@ agents=[A,B,C]
 pairs=[(A,B),(A,C),(B,C)]
 
 step=0; msgs=[]; treasure=None; winner=None
-while step<200 and not treasure:
-    step+=1
-    for a in agents:
-        found=a.step()
-        if found:
-            treasure, winner = found, a
-            break
-    if step%3==0:
-        print(f"\n══ Step {step} MESSAGE FLOW ══")
-        for s,r in pairs:
-            n=s.share_to(r)
-            if n>0:
-                msg=f"{s.name}→{r.name}: {n} cells"
-                print("  "+msg); msgs.append(msg)
+with metrics.profiled():
+    while step<200 and not treasure:
+        step+=1
+        metrics.incr("maze_steps")
+        for a in agents:
+            found=a.step()
+            if found:
+                treasure, winner = found, a
+                break
+        if step%3==0:
+            print(f"\n══ Step {step} MESSAGE FLOW ══")
+            for s,r in pairs:
+                n=s.share_to(r)
+                if n>0:
+                    msg=f"{s.name}→{r.name}: {n} cells"
+                    print("  "+msg); msgs.append(msg)
 
 if not treasure:
     print("Treasure not found.")
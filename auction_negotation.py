@@ -1,4 +1,5 @@
 # Tiny Resource Negotiators — focused on negotiation logs
+import instrumentation as metrics
 
 class Agent:
     def __init__(self, name, budget, wants):
@@ -39,6 +40,9 @@ def negotiate(item):
                 if prop > price:
                     proposals.append((a, prop))
                     print(f"    {a.name} proposes ${prop}")
+        metrics.incr("auction_rounds")
+        metrics.incr("auction_proposals", len(proposals))
+        metrics.observe("auction_proposals_per_round", len(proposals))
         if not proposals:
             # no raises -> award at current price to highest-capable
             possible = [c for c in cont if c["max"]>=price]
@@ -62,8 +66,9 @@ def negotiate(item):
         print("  No agreement.")
 
 print("NEGOTIATION LOGS")
-for r in ["CPU","GPU","RAM"]:
-    negotiate(r)
+with metrics.profiled():
+    for r in ["CPU","GPU","RAM"]:
+        negotiate(r)
 
 print("\nRESULTS")
 for a in agents:
@@ -2,6 +2,8 @@
 # Simple, rule-based zone allocation for cleaners.
 # Output: conflict-free task completion log.
 
+import instrumentation as metrics
+
 class Cleaner:
     def __init__(self, name, preferred_zones, priority=0):
         """
@@ -52,6 +54,13 @@ def negotiate(cleaners, zones=None):
             # no more proposals
             break
 
+        if metrics.enabled:
+            n_props = sum(len(p) for p in proposals.values())
+            metrics.incr("cleaner_rounds")
+            metrics.incr("cleaner_proposals", n_props)
+            metrics.observe("cleaner_proposals_per_round", n_props)
+            metrics.observe("cleaner_conflicts_per_round", sum(1 for p in proposals.values() if len(p) > 1))
+
         print(f"\nRound {round_no} proposals:")
         for zone, proposers in proposals.items():
             names = ", ".join(f"{p.name}(pri={p.priority})" for p in proposers)
@@ -104,4 +113,5 @@ if __name__ == "__main__":
         Cleaner("B", ["Z2","Z4","Z5"], priority=1),
         Cleaner("C", ["Z1","Z6"], priority=1)
     ]
-    negotiate(cleaners)
+    with metrics.profiled():
+        negotiate(cleaners)
@@ -0,0 +1,230 @@
+# instrumentation.py
+# Tiny, stdlib-only counters / timers / histograms for the simulations.
+# Disabled by default: every hook returns immediately until enable() is called
+# (or AI_METRICS is set in the environment).
+#
+#   AI_METRICS=json  python Message_passing.py   -> JSON snapshot on stderr at exit
+#   AI_METRICS=prom  python eighth.py            -> Prometheus text on stderr at exit
+#   AI_PROFILE=cprofile|sample                   -> profile whatever runs inside profiled()
+
+import atexit, cProfile, io, json, os, pstats, sys, threading, time
+from collections import Counter
+from contextlib import contextmanager
+
+# Default buckets: seconds for timers, plain sizes for everything else.
+TIME_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+PROFILE_MODES = ("cprofile", "sample")
+
+enabled = False
+_lock = threading.Lock()
+_counters = {}
+_hists = {}
+
+
+class _Hist:
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # non-cumulative; last slot = overflow (+Inf)
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def add(self, v):
+        self.count += 1
+        self.sum += v
+        self.min = v if self.min is None or v < self.min else self.min
+        self.max = v if self.max is None or v > self.max else self.max
+        for i, b in enumerate(self.buckets):
+            if v <= b:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _hists.clear()
+
+
+# ----- hooks (no-ops while disabled) -----
+def incr(name, n=1):
+    if not enabled: return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def observe(name, value, buckets=SIZE_BUCKETS):
+    if not enabled: return
+    with _lock:
+        h = _hists.get(name)
+        if h is None:
+            h = _hists[name] = _Hist(buckets)
+        h.add(value)
+
+class _NullTimer:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ("name", "t0")
+    def __init__(self, name): self.name = name
+    def __enter__(self):
+        self.t0 = time.perf_counter(); return self
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0, TIME_BUCKETS)
+        return False
+
+def timer(name):
+    """Context manager recording elapsed seconds into histogram `name`."""
+    return _Timer(name) if enabled else _NULL_TIMER
+
+
+# ----- export -----
+def snapshot():
+    """
+    Plain-dict copy of all metrics (safe to mutate / json.dumps).
+    Histogram buckets are an ordered list of [le, count] pairs ending in
+    ["+Inf", overflow]; counts are per bucket (not cumulative), so they sum to count.
+    """
+    with _lock:
+        hists = {}
+        for name, h in _hists.items():
+            hists[name] = {
+                "count": h.count, "sum": h.sum, "min": h.min, "max": h.max,
+                "mean": h.sum / h.count if h.count else None,
+                "cumulative": False,
+                "buckets": [[b, c] for b, c in zip(h.buckets + ("+Inf",), h.counts)],
+            }
+        return {"counters": dict(_counters), "histograms": hists}
+
+def to_json(indent=2):
+    snap = snapshot()
+    snap["counters"] = dict(sorted(snap["counters"].items()))
+    snap["histograms"] = dict(sorted(snap["histograms"].items()))
+    return json.dumps(snap, indent=indent)
+
+def _prom_name(name):
+    return "".join(ch if ch.isalnum() or ch in "_:" else "_" for ch in name)
+
+def to_prometheus():
+    """
+    Snapshot in Prometheus text exposition format. Counters get the `_total`
+    suffix; histogram `_bucket` lines are cumulative, as Prometheus expects.
+    """
+    snap = snapshot()
+    out = []
+    for name, v in sorted(snap["counters"].items()):
+        n = _prom_name(name)
+        n = n if n.endswith("_total") else n + "_total"
+        out.append(f"# TYPE {n} counter")
+        out.append(f"{n} {v}")
+    for name, h in sorted(snap["histograms"].items()):
+        n = _prom_name(name)
+        out.append(f"# TYPE {n} histogram")
+        cum = 0
+        for b, c in h["buckets"]:
+            cum += c
+            out.append(f'{n}_bucket{{le="{b}"}} {cum}')
+        out.append(f"{n}_sum {h['sum']}")
+        out.append(f"{n}_count {h['count']}")
+    return "\n".join(out) + "\n"
+
+def dump(fmt="json", file=None):
+    file = file or sys.stderr
+    file.write(to_prometheus() if fmt in ("prom", "prometheus") else to_json() + "\n")
+
+
+# ----- profiling (scoped to one run) -----
+def _frame_name(frame):
+    co = frame.f_code
+    return f"{os.path.basename(co.co_filename)}:{co.co_name}"
+
+def _sampler(tid, interval, stop, hits):
+    # One sample = the whole stack of thread `tid`, root first, leaf line last,
+    # keyed as "root;caller;leaf:lineno" (folded-stack / flamegraph format).
+    while not stop.wait(interval):
+        frame = sys._current_frames().get(tid)
+        if frame is None:
+            continue
+        stack = [f"{_frame_name(frame)}:{frame.f_lineno}"]
+        frame = frame.f_back
+        while frame is not None:
+            stack.append(_frame_name(frame))
+            frame = frame.f_back
+        hits[";".join(reversed(stack))] += 1
+
+def _sample_report(hits, interval, top, file):
+    total = sum(hits.values())
+    file.write(f"--- sampling profile ({total} samples @ {interval}s) ---\n")
+    if not total:
+        file.write("  (block finished before the first sample; lower `interval` or profile a longer run)\n")
+        return
+    inclusive, leaf = Counter(), Counter()
+    for stack, n in hits.items():
+        frames = stack.split(";")
+        leaf[frames[-1]] += n
+        funcs = frames[:-1] + [frames[-1].rsplit(":", 1)[0]]   # drop leaf lineno
+        for fn in set(funcs):                                  # set: count recursion once
+            inclusive[fn] += n
+    for title, counts in (("total (function + callees)", inclusive), ("self (leaf line)", leaf)):
+        file.write(f"  {title}:\n")
+        for loc, n in counts.most_common(top):
+            file.write(f"    {n:6d}  {100.0 * n / total:5.1f}%  {loc}\n")
+
+@contextmanager
+def profiled(mode=None, top=15, interval=0.001, file=None):
+    """
+    Profile only the code inside the with-block.
+      mode: "cprofile", "sample", or None (falls back to AI_PROFILE env; unset = no-op)
+    Report (and any unknown-mode warning) goes to `file`, stderr by default.
+    "sample" yields a Counter of folded stacks and reports per-function totals
+    and leaf lines; it samples every `interval` seconds, so a block shorter than
+    `interval` reports 0 samples.
+    """
+    mode = (mode or os.environ.get("AI_PROFILE") or "").strip().lower()
+    file = file or sys.stderr
+    if mode and mode not in PROFILE_MODES:
+        file.write(f"instrumentation: unknown profile mode {mode!r} "
+                   f"(expected one of {', '.join(PROFILE_MODES)}); profiling disabled\n")
+    if mode == "cprofile":
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield prof
+        finally:
+            prof.disable()
+            s = io.StringIO()
+            pstats.Stats(prof, stream=s).sort_stats("cumulative").print_stats(top)
+            file.write(s.getvalue())
+    elif mode == "sample":
+        hits, stop = Counter(), threading.Event()
+        t = threading.Thread(target=_sampler, args=(threading.get_ident(), interval, stop, hits), daemon=True)
+        t.start()
+        try:
+            yield hits
+        finally:
+            stop.set(); t.join()
+            _sample_report(hits, interval, top, file)
+    else:
+        yield None
+
+
+_ENV_FMT = os.environ.get("AI_METRICS", "").strip().lower()
+if _ENV_FMT and _ENV_FMT not in ("0", "false", "off"):
+    enable()
+    atexit.register(dump, "prom" if _ENV_FMT in ("prom", "prometheus") else "json")
@@ -0,0 +1,164 @@
+# test_instrumentation.py
+import importlib.util, io, json, os, subprocess, sys, time
+
+import pytest
+
+import instrumentation as metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh():
+    metrics.reset(); metrics.enable()
+    yield
+    metrics.disable(); metrics.reset()
+
+
+def test_disabled_hooks_record_nothing():
+    metrics.disable()
+    metrics.incr("c")
+    metrics.observe("h", 3)
+    with metrics.timer("t"):
+        pass
+    assert metrics.snapshot() == {"counters": {}, "histograms": {}}
+
+
+def test_counters_accumulate():
+    metrics.incr("c"); metrics.incr("c", 4)
+    assert metrics.snapshot()["counters"] == {"c": 5}
+
+
+def test_hist_bucketing_and_overflow():
+    for v in (0, 1, 3, 3, 2000):
+        metrics.observe("h", v, buckets=(1, 5, 10))
+    h = metrics.snapshot()["histograms"]["h"]
+    assert h["cumulative"] is False
+    assert h["buckets"] == [[1, 2], [5, 2], [10, 0], ["+Inf", 1]]
+    assert sum(c for _, c in h["buckets"]) == h["count"] == 5
+    assert (h["min"], h["max"], h["sum"]) == (0, 2000, 2007)
+    assert isinstance(h["sum"], int)
+
+
+def test_timer_records_seconds():
+    with metrics.timer("t"):
+        pass
+    h = metrics.snapshot()["histograms"]["t"]
+    assert h["count"] == 1 and h["min"] >= 0
+    assert [b for b, _ in h["buckets"]] == list(metrics.TIME_BUCKETS) + ["+Inf"]
+
+
+def test_json_keeps_bucket_order():
+    metrics.observe("h", 7)
+    buckets = json.loads(metrics.to_json())["histograms"]["h"]["buckets"]
+    assert [b for b, _ in buckets] == list(metrics.SIZE_BUCKETS) + ["+Inf"]
+
+
+def test_prometheus_text():
+    metrics.incr("nodes.expanded", 3)
+    for v in (1, 4, 50):
+        metrics.observe("h", v, buckets=(1, 5))
+    lines = metrics.to_prometheus().splitlines()
+    assert "# TYPE nodes_expanded_total counter" in lines
+    assert "nodes_expanded_total 3" in lines
+    assert lines[-6:] == [
+        "# TYPE h histogram",
+        'h_bucket{le="1"} 1',
+        'h_bucket{le="5"} 2',
+        'h_bucket{le="+Inf"} 3',
+        "h_sum 55",
+        "h_count 3",
+    ]
+
+
+def test_profiled_noop_without_mode(monkeypatch):
+    monkeypatch.delenv("AI_PROFILE", raising=False)
+    with metrics.profiled() as prof:
+        assert prof is None
+
+
+def test_profiled_normalises_env(monkeypatch, capsys):
+    monkeypatch.setenv("AI_PROFILE", " cProfile ")
+    with metrics.profiled(top=1) as prof:
+        assert prof is not None
+    assert "function calls" in capsys.readouterr().err
+
+
+def test_profiled_warns_on_unknown_mode():
+    out = io.StringIO()
+    with metrics.profiled("bogus", file=out) as prof:
+        assert prof is None
+    assert "unknown profile mode 'bogus'" in out.getvalue()
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+def test_profiled_sample_records_stacks():
+    out = io.StringIO()
+    with metrics.profiled("sample", interval=0.001, file=out) as hits:
+        _spin(0.1)
+    assert hits
+    assert any("_spin" in stack.split(";")[-1] for stack in hits)
+    assert any("test_profiled_sample_records_stacks" in stack for stack in hits)
+    report = out.getvalue()
+    assert report.startswith("--- sampling profile (")
+    assert "test_instrumentation.py:_spin" in report
+
+
+def test_profiled_sample_reports_zero_samples():
+    out = io.StringIO()
+    with metrics.profiled("sample", interval=10, file=out) as hits:
+        pass
+    assert not hits
+    assert "0 samples" in out.getvalue()
+
+
+# ----- call sites in the simulations -----
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_eighth_negotiate_counts(capsys):
+    import eighth
+    eighth.negotiate([
+        eighth.Cleaner("A", ["Z1","Z2","Z3"], priority=2),
+        eighth.Cleaner("B", ["Z2","Z4","Z5"], priority=1),
+        eighth.Cleaner("C", ["Z1","Z6"], priority=1),
+    ])
+    snap = metrics.snapshot()
+    assert snap["counters"] == {"cleaner_rounds": 3, "cleaner_proposals": 7}
+    conflicts = snap["histograms"]["cleaner_conflicts_per_round"]
+    assert (conflicts["count"], conflicts["sum"]) == (3, 1)
+    assert conflicts["buckets"][:2] == [[0, 2], [1, 1]]
+    assert snap["histograms"]["cleaner_proposals_per_round"]["sum"] == 7
+
+
+def test_plan_run_times_each_step():
+    spec = importlib.util.spec_from_file_location("ai4", os.path.join(HERE, "AI 4.py"))
+    ai4 = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ai4)
+    res = ai4.run(seed=1)
+    assert metrics.snapshot()["histograms"]["plan_step_seconds"]["count"] == res["steps"]
+
+
+def _script_metrics(script):
+    env = dict(os.environ, AI_METRICS="json", PYTHONIOENCODING="utf-8")
+    env.pop("AI_PROFILE", None)
+    proc = subprocess.run([sys.executable, script], cwd=HERE, env=env,
+                          capture_output=True, text=True, encoding="utf-8", check=True)
+    return json.loads(proc.stderr)
+
+
+def test_message_passing_script_metrics():
+    snap = _script_metrics("Message_passing.py")
+    c = snap["counters"]
+    assert c["maze_bfs_nodes_expanded"] == 41
+    assert c["maze_bfs_nodes_enqueued"] == 48
+    assert c["maze_cells_transferred"] == 40
+    assert snap["histograms"]["maze_cells_per_share"]["sum"] == 40
+
+
+def test_auction_script_metrics():
+    c = _script_metrics("auction_negotation.py")["counters"]
+    assert (c["auction_rounds"], c["auction_proposals"]) == (6, 12)